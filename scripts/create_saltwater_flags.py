@@ -20,11 +20,54 @@ Date: November 21, 2025
 """
 
 import geopandas as gpd
+import numpy as np
 import pandas as pd
+import pyogrio
+import pyproj
 import requests
+import shapely
+import hashlib
 import os
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from io import BytesIO
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# Shared HTTP session: reuses TCP/TLS connections across the paginated
+# CKAN and ArcGIS requests and retries transient server errors.
+# pool_maxsize covers the worst-case concurrency against one host:
+# 3 CKAN resource workers x 8 page workers each
+SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=24,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=(502, 503, 504)),
+)
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
+
+# Saltwater polygon source endpoints; also used to key the on-disk
+# polygon cache so a source change invalidates it
+WETLANDS_URL = "https://gis.cnra.ca.gov/arcgis/rest/services/Ocean/CSMW_Coastal_Wetlands/MapServer/0/query"
+NAMED_LAKES_URL = "https://gispublic.waterboards.ca.gov/portalserver/rest/services/Hosted/All_CA_Named_Streams_and_Lakes/FeatureServer/1/query?where=name%3D%27Salton+Sea%27&outFields=*&returnGeometry=true&f=json" # Filter for Salton Sea
+MARINE_URL = "https://services3.arcgis.com/uknczv4rpevve42E/ArcGIS/rest/services/California_Cartographic_Coastal_Polygons/FeatureServer/31/query"
+ESTUARIES_URL = "https://services2.arcgis.com/Uq9r85Potqm3MfRV/ArcGIS/rest/services/biosds2792_fpu/FeatureServer/0/query"
+SALTWATER_SOURCE_URLS = (WETLANDS_URL, NAMED_LAKES_URL, MARINE_URL, ESTUARIES_URL)
+
+# One compiled PROJ pipeline per source CRS into the analysis CRS
+# (EPSG:3310); building a Transformer is not free, so every
+# reprojection shares these instead of creating its own
+TO_3310 = {
+    epsg: pyproj.Transformer.from_crs(epsg, 3310, always_xy=True)
+    for epsg in (4326, 5070)
+}
+
+# How long the cached saltwater polygons stay usable before the sources
+# are re-downloaded
+SALTWATER_CACHE_MAX_AGE_DAYS = 30
 
 
 def setup_cache_directory(cache_dir="data_cache"):
@@ -45,7 +88,7 @@ def fetch_or_cache(url, local_path):
         FileNotFoundError: If download fails and no cached copy exists
     """
     try:
-        r = requests.get(url, timeout=30)
+        r = SESSION.get(url, timeout=30)
         r.raise_for_status()
         with open(local_path, "wb") as f:
             f.write(r.content)
@@ -56,29 +99,126 @@ def fetch_or_cache(url, local_path):
             raise FileNotFoundError(f"No cached copy for {url}")
 
 
-def load_wetlands(buffer_meters=10):
+def fetch_arcgis_paginated(base_url, params, page_size=2000, max_pages=1000):
+    """
+    Stream an ArcGIS FeatureServer/MapServer query in pages.
+
+    Issues resultOffset/resultRecordCount requests so only one page of
+    features is held in memory at a time, instead of materializing the
+    whole layer in a single JSON response.
+
+    Args:
+        base_url (str): Layer query endpoint (ending in /query)
+        params (dict): Query parameters (where, outFields, outSR, ...)
+        page_size (int): Number of features per request
+        max_pages (int): Safety cap on the number of page requests
+
+    Returns:
+        gpd.GeoDataFrame: All features from the layer
+
+    Raises:
+        RuntimeError: If the server still reports more features after
+        max_pages requests (e.g. it ignores resultOffset)
+    """
+    pages = []
+    offset = 0
+    for _ in range(max_pages):
+        page_params = dict(params)
+        page_params.update({
+            "resultOffset": offset,
+            "resultRecordCount": page_size,
+            "f": "geojson",
+        })
+        r = SESSION.get(base_url, params=page_params, timeout=60)
+        r.raise_for_status()
+        page = pyogrio.read_dataframe(BytesIO(r.content))
+        pages.append(page)
+        # Keep paging while the server reports more features; the flag
+        # sits at the top level or under properties depending on server
+        payload = r.json()
+        exceeded = payload.get(
+            "exceededTransferLimit",
+            payload.get("properties", {}).get("exceededTransferLimit", False)
+        )
+        if not exceeded or len(page) == 0:
+            break
+        offset += len(page)
+    else:
+        raise RuntimeError(
+            f"{base_url} still reported more features after {max_pages} pages"
+        )
+    return gpd.GeoDataFrame(pd.concat(pages, ignore_index=True))
+
+
+def reproject_to_3310(geoms, src_epsg):
+    """
+    Reproject an array of geometries to EPSG:3310.
+
+    Uses the shared Transformer for the source CRS and rewrites the
+    coordinate arrays in bulk via shapely.transform.
+
+    Args:
+        geoms (np.ndarray): Array of shapely geometries
+        src_epsg (int): EPSG code of the source CRS (4326 or 5070)
+
+    Returns:
+        np.ndarray: Reprojected geometries
+    """
+    transformer = TO_3310[src_epsg]
+
+    def project(coords):
+        xs, ys = transformer.transform(coords[:, 0], coords[:, 1])
+        return np.column_stack([xs, ys])
+
+    return shapely.transform(geoms, project)
+
+
+def union_and_buffer(geoms, buffer_meters):
+    """
+    Simplify, union, and buffer an array of source polygons.
+
+    Point-in-polygon cost scales with edge count, so coastline detail
+    finer than half the buffer distance is simplified away first; the
+    buffer absorbs the difference, leaving the classification result
+    unchanged.
+
+    Args:
+        geoms (np.ndarray): Array of shapely geometries in EPSG:3310
+        buffer_meters (float): Buffer distance in meters
+
+    Returns:
+        shapely.Geometry: Buffered union of the simplified polygons
+    """
+    simplified = shapely.simplify(geoms, tolerance=buffer_meters / 2, preserve_topology=False)
+    return shapely.unary_union(simplified).buffer(buffer_meters)
+
+
+def load_wetlands():
     """
     Load the saline wetlands dataset from the California Coastal Sediment Management Workgroup (CSMW). This service is hosted on the CNRA GIS server.
 
     CSMW link: https://dbw.parks.ca.gov/?page_id=28708
     Service link: https://gis.cnra.ca.gov/arcgis/rest/services/Ocean/CSMW_Coastal_Wetlands/MapServer
-    
-    Args:
-        buffer_meters (float): Buffer distance in meters
-        
+
+    Buffering is applied downstream in main, once, to the union of all
+    wetland polygons.
+
     Returns:
-        gpd.GeoDataFrame: Saline wetlands polygons in EPSG:3310
+        gpd.GeoDataFrame: Raw saline wetlands polygons in EPSG:3310
     """
     print("Loading saline wetlands data...")
 
-    # Specify EPSG:3310 in the query
-    saline_wetland_url = 'https://gis.cnra.ca.gov/arcgis/rest/services/Ocean/CSMW_Coastal_Wetlands/MapServer/0/query?where=1=1&outSR=3310&outFields=*&f=json' 
-
-    wetlands = gpd.read_file(saline_wetland_url)
+    # Request EPSG:4326 explicitly; GeoJSON responses default to WGS84, but pin it rather than rely on the server
+    wetlands = fetch_arcgis_paginated(
+        WETLANDS_URL,
+        {"where": "1=1", "outSR": 4326, "outFields": "*"}
+    )
     print(f"Loaded {len(wetlands)} saline wetland polygons")
 
-    wetlands = wetlands.explode(index_parts=False) # Convert multipolgygon to multiple single polygons
-    wetlands = wetlands.buffer(buffer_meters) 
+    # Reproject to EPSG:3310
+    wetlands = wetlands.set_geometry(gpd.GeoSeries(
+        reproject_to_3310(wetlands.geometry.values, 4326), index=wetlands.index, crs="EPSG:3310"
+    ))
     return wetlands
 
 
@@ -127,16 +267,19 @@ def load_saline_lakes(cache_dir, buffer_meters=50):
         print("Using existing extracted SalineLakeBnd directory")
 
     # Load Saline Lake Ecosystems IWAA Lakes data
-    lakes = gpd.read_file(lakes_path)
-    lakes = lakes.set_crs('EPSG:5070') # Define projection as EPSG:5070 (https://www.sciencebase.gov/catalog/item/667f1a25d34e2cb7853eaf4f)
-    lakes = lakes.to_crs('EPSG:3310') # Reproject to EPSG:3310
+    lakes = gpd.read_file(lakes_path, engine="pyogrio")
+    # Source projection is EPSG:5070 (https://www.sciencebase.gov/catalog/item/667f1a25d34e2cb7853eaf4f); reproject to EPSG:3310
+    lakes = lakes.set_geometry(gpd.GeoSeries(
+        reproject_to_3310(lakes.geometry.values, 5070), index=lakes.index, crs="EPSG:3310"
+    ))
+    lakes = lakes.simplify(buffer_meters / 2, preserve_topology=False) # Drop detail finer than the buffer
     lakes = lakes.buffer(buffer_meters)
 
     # Load CA Named Lakes dataset (Salton Sea polygon)
-    named_lakes_url = "https://gispublic.waterboards.ca.gov/portalserver/rest/services/Hosted/All_CA_Named_Streams_and_Lakes/FeatureServer/1/query?where=name%3D%27Salton+Sea%27&outFields=*&returnGeometry=true&f=json" # Filter for Salton Sea
-    salton_sea = gpd.read_file(named_lakes_url)
+    salton_sea = gpd.read_file(NAMED_LAKES_URL, engine="pyogrio")
     salton_sea = salton_sea.set_crs('EPSG:3310') # Define projection as EPSG:3310, verified in ArcGIS
-    salton_sea = salton_sea.buffer(buffer_meters) 
+    salton_sea = salton_sea.simplify(buffer_meters / 2, preserve_topology=False)
+    salton_sea = salton_sea.buffer(buffer_meters)
 
     # Combine all lake polygons into one gdf
     all_lakes = pd.concat([lakes, salton_sea], ignore_index=True)
@@ -159,14 +302,18 @@ def load_marine_coastal_areas(buffer_meters=50):
     """
 
     print("Loading marine coastal areas...")
-    url = "https://services3.arcgis.com/uknczv4rpevve42E/ArcGIS/rest/services/California_Cartographic_Coastal_Polygons/FeatureServer/31/query?where=1=1&outFields=*&outSR=4326&f=json"
-    coastal = gpd.read_file(url) # Imported as EPSG:4326
-    coastal = coastal.to_crs('EPSG:3310') # Convert to EPSG:3310
+    coastal = fetch_arcgis_paginated(
+        MARINE_URL,
+        {"where": "1=1", "outFields": "*", "outSR": 4326}
+    ) # Imported as EPSG:4326
+    # Convert to EPSG:3310
+    coastal = coastal.set_geometry(gpd.GeoSeries(
+        reproject_to_3310(coastal.geometry.values, 4326), index=coastal.index, crs="EPSG:3310"
+    ))
     print(f"Found {len(coastal)} marine polygons")
 
-    # Union and apply buffer
-    marine_union = coastal.geometry.union_all()
-    marine_union = marine_union.buffer(buffer_meters)
+    # Simplify, union, and apply buffer
+    marine_union = union_and_buffer(coastal.geometry.values, buffer_meters)
     print(f"Applied {buffer_meters} meter buffer to marine areas")
     
     # Wrap in GeoDataFrame
@@ -175,67 +322,159 @@ def load_marine_coastal_areas(buffer_meters=50):
     return marine_buffered_gdf
 
 
-def load_estuaries(buffer_meters=50):
+def load_estuaries():
     """
     Load current and historical estuary extent data from CDFW
     Link: https://www.arcgis.com/home/item.html?id=c0b97243451f46db84b51d044424b51a
-    
-    Args:
-        buffer_meters (float): Buffer distance in meters
-        
+
+    Buffering is applied downstream in main, once, to the union of all
+    estuary polygons.
+
     Returns:
-        gpd.GeoDataFrame: Estuary polygons in EPSG:3310
+        gpd.GeoDataFrame: Raw estuary polygons in EPSG:3310
     """
     # Filter out CMECS_Class == "Major River Delta" as these features extend too far inland to the Lower American
-    url = "https://services2.arcgis.com/Uq9r85Potqm3MfRV/ArcGIS/rest/services/biosds2792_fpu/FeatureServer/0/query?where=CMECS_Class+%3C%3E+%27Major+River+Delta%27&outFields=*&returnGeometry=true&f=json"
-    estuaries = gpd.read_file(url)
-    estuaries = estuaries.explode(index_parts=False) # Convert multipolgygon to multiple single polygons
+    # Request EPSG:4326 explicitly; GeoJSON responses default to WGS84, but pin it rather than rely on the server
+    estuaries = fetch_arcgis_paginated(
+        ESTUARIES_URL,
+        {"where": "CMECS_Class <> 'Major River Delta'", "outFields": "*", "returnGeometry": "true", "outSR": 4326}
+    )
 
-    estuaries = estuaries.set_crs('EPSG:3857') # Define projection as EPSG:3857 based on service page metadata
-    estuaries = estuaries.to_crs('EPSG:3310') # Reproject to EPSG:3310
+    # Reproject to EPSG:3310
+    estuaries = estuaries.set_geometry(gpd.GeoSeries(
+        reproject_to_3310(estuaries.geometry.values, 4326), index=estuaries.index, crs="EPSG:3310"
+    ))
     print(f"Found {len(estuaries)} estuary polygons")
 
-    # estuary_union = estuaries.geometry.union_all()
-    estuary_buffer = estuaries.buffer(buffer_meters)
+    return estuaries
 
-    # Wrap in GeoDataFrame
-    estuary_gdf = gpd.GeoDataFrame(geometry=estuary_buffer, crs="EPSG:3310")
 
-    return estuary_gdf
+def saltwater_cache_key(cache_dir):
+    """
+    Compute the cache key for the saltwater polygon index.
+
+    The key changes when any source URL changes or when the manually
+    downloaded saline lake zip is replaced, invalidating the cache.
 
+    Args:
+        cache_dir (str): Cache directory path
 
-def fetch_ckan_all(resource_id, fields=None):
+    Returns:
+        str: Hex digest identifying the current set of sources
     """
-    Fetch all records from a CKAN resource, handling pagination.
-    
+    parts = list(SALTWATER_SOURCE_URLS)
+    lake_zip_path = os.path.join(cache_dir, "SalineLakeBnd.zip")
+    if os.path.exists(lake_zip_path):
+        parts.append(str(os.path.getmtime(lake_zip_path)))
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+def load_saltwater_index(cache_dir, max_age_days=SALTWATER_CACHE_MAX_AGE_DAYS):
+    """
+    Load the cached saltwater polygons if the cache is still valid.
+
+    The cache is used only when the GeoParquet file exists, its recorded
+    source key matches the current sources, and it is younger than
+    max_age_days (the sources refresh quarterly at most).
+
+    Args:
+        cache_dir (str): Cache directory path
+        max_age_days (float): Maximum cache age in days
+
+    Returns:
+        gpd.GeoDataFrame or None: Cached saltwater polygons in EPSG:3310,
+        or None if there is no usable cache
+    """
+    parquet_path = os.path.join(cache_dir, "saltwater_union.parquet")
+    key_path = parquet_path + ".key"
+    if not (os.path.exists(parquet_path) and os.path.exists(key_path)):
+        return None
+
+    with open(key_path) as f:
+        if f.read().strip() != saltwater_cache_key(cache_dir):
+            print("Saltwater polygon cache is stale, rebuilding from sources...")
+            return None
+
+    age_days = (datetime.now().timestamp() - os.path.getmtime(parquet_path)) / 86400
+    if age_days > max_age_days:
+        print(f"Saltwater polygon cache is {age_days:.0f} days old, rebuilding from sources...")
+        return None
+
+    print(f"Loaded saltwater polygons from {parquet_path}")
+    return gpd.read_parquet(parquet_path)
+
+
+def save_saltwater_index(saltwater_polygons, cache_dir):
+    """
+    Persist the combined saltwater polygons as GeoParquet for reuse across runs.
+
+    Args:
+        saltwater_polygons (gpd.GeoDataFrame): Combined saltwater polygons
+        cache_dir (str): Cache directory path
+    """
+    parquet_path = os.path.join(cache_dir, "saltwater_union.parquet")
+    saltwater_polygons.to_parquet(parquet_path, compression="zstd")
+    with open(parquet_path + ".key", "w") as f:
+        f.write(saltwater_cache_key(cache_dir))
+    print(f"Saved saltwater polygons to {parquet_path}")
+
+
+def fetch_ckan_all(resource_id, fields):
+    """
+    Fetch all records from a CKAN resource via the datastore SQL endpoint.
+
+    Only the requested fields are selected server-side, a count(*) query
+    determines the number of pages, and the LIMIT/OFFSET pages are
+    fetched concurrently. Columns are cast to the requested dtypes
+    instead of being left as Python objects.
+
     Args:
         resource_id (str): CKAN resource ID
-        fields (str, optional): Comma-separated field names to retrieve
-        
+        fields (dict): Mapping of field name to pandas dtype
+
     Returns:
-        pd.DataFrame: All records from the resource
+        pd.DataFrame: All records from the resource, with typed columns
     """
-    base_url = "https://data.ca.gov/api/3/action/datastore_search"
-    offset = 0
+    base_url = "https://data.ca.gov/api/3/action/datastore_search_sql"
     limit = 50000
-    dfs = []
-    
-    while True:
-        params = {"resource_id": resource_id, "limit": limit, "offset": offset}
-        if fields:
-            params["fields"] = fields
-            
-        r = requests.get(base_url, params=params)
+    field_list = ", ".join(f'"{field}"' for field in fields)
+
+    def fetch_sql(sql):
+        r = SESSION.get(base_url, params={"sql": sql})
         r.raise_for_status()
-        result = r.json()["result"]
-        records = result["records"]
-        dfs.append(pd.DataFrame(records))
-        
-        offset += limit
-        if offset >= result["total"]:
-            break
-            
-    return pd.concat(dfs, ignore_index=True)
+        return r.json()["result"]
+
+    def page_sql(offset, page_size):
+        # ORDER BY the datastore _id column: without a sort key Postgres
+        # guarantees no row order, so concurrent offset pages could
+        # overlap or skip rows
+        return f'SELECT {field_list} FROM "{resource_id}" ORDER BY "_id" LIMIT {page_size} OFFSET {offset}'
+
+    total = int(fetch_sql(f'SELECT count(*) AS n FROM "{resource_id}"')["records"][0]["n"])
+    if total == 0:
+        return pd.DataFrame(columns=list(fields)).astype(fields)
+
+    # The SQL endpoint silently truncates results larger than the
+    # portal's rows_max and flags it with records_truncated; when the
+    # first page comes back truncated, its actual row count is the
+    # server's cap, so step the remaining offsets by that instead
+    first = fetch_sql(page_sql(0, limit))
+    dfs = [pd.DataFrame(first["records"])]
+    page_size = len(first["records"]) if first.get("records_truncated") else limit
+
+    def fetch_page(offset):
+        result = fetch_sql(page_sql(offset, page_size))
+        if result.get("records_truncated"):
+            raise RuntimeError(
+                f"CKAN truncated a {page_size}-row page for resource {resource_id}"
+            )
+        return pd.DataFrame(result["records"])
+
+    if total > page_size:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            dfs.extend(pool.map(fetch_page, range(page_size, total, page_size)))
+
+    return pd.concat(dfs, ignore_index=True).astype(fields)
 
 
 def load_monitoring_sites():
@@ -243,7 +482,7 @@ def load_monitoring_sites():
     Load water quality monitoring sites from CA Open Data.
     
     Returns:
-        gpd.GeoDataFrame: Monitoring sites with geometry in EPSG:4326
+        gpd.GeoDataFrame: Monitoring sites with geometry in EPSG:3310
     """
     print("Loading monitoring sites from CA Open Data...")
     
@@ -254,30 +493,43 @@ def load_monitoring_sites():
         "15a63495-8d9f-4a49-b43a-3092ef3106b9"
     ]
     
-    # Fetch site data from all resources
-    sites = pd.concat([
-        fetch_ckan_all(rid, "StationCode,TargetLatitude,TargetLongitude") 
-        for rid in resource_ids
-    ], ignore_index=True)
+    # Float32 keeps ~1 m coordinate precision at half the memory
+    site_fields = {
+        "StationCode": "string[pyarrow]",
+        "TargetLatitude": "float32",
+        "TargetLongitude": "float32",
+    }
+
+    # Fetch site data from all resources concurrently
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        frames = pool.map(lambda rid: fetch_ckan_all(rid, site_fields), resource_ids)
+        sites = pd.concat(frames, ignore_index=True)
     
-    # Remove duplicates
-    sites = sites.drop_duplicates()
+    # Remove duplicates on the fields that define a unique site, rather
+    # than hashing every cell of every column
+    sites = sites.drop_duplicates(subset=["StationCode", "TargetLatitude", "TargetLongitude"])
     print(f"Loaded {sites['StationCode'].nunique()} unique monitoring stations")
     
-    # Create GeoDataFrame
+    # Extract coordinates as float arrays and drop sites with missing or
+    # out-of-range coordinates before any geometry is built
+    lat = sites["TargetLatitude"].to_numpy()
+    lon = sites["TargetLongitude"].to_numpy()
+    valid = (
+        np.isfinite(lat) & np.isfinite(lon)
+        & (np.abs(lat) <= 90) & (np.abs(lon) <= 180)
+    )
+    sites = sites[valid].reset_index(drop=True)
+    lat, lon = lat[valid], lon[valid]
+    print(f"Sites with valid coordinates: {len(sites)}")
+
+    # Project the coordinate arrays to EPSG:3310 and build Points in one
+    # vectorized call; no intermediate EPSG:4326 geometries are created
+    x, y = TO_3310[4326].transform(lon, lat)
     gdf_sites = gpd.GeoDataFrame(
         sites,
-        geometry=gpd.points_from_xy(sites.TargetLongitude, sites.TargetLatitude),
-        crs="EPSG:4326"
+        geometry=gpd.GeoSeries(shapely.points(x, y), crs="EPSG:3310")
     )
-    
-    # Remove sites with invalid coordinates
-    gdf_sites = gdf_sites.dropna(subset=["geometry"])
-    print(f"Sites with valid coordinates: {len(gdf_sites)}")
 
-    # Convert to EPSG:3310
-    gdf_sites = gdf_sites.to_crs('EPSG:3310')
-    
     return gdf_sites
 
 
@@ -294,12 +546,27 @@ def classify_sites(gdf_sites, saltwater_polygons):
     """
     print("Classifying sites as saltwater or freshwater...")
     
-    # Union all saltwater geometries
-    saltwater_union = saltwater_polygons.geometry.union_all()
-    print(f"Saltwater union geometry type: {saltwater_union.geom_type}")
-    
+    # Index the saltwater polygons in an STRtree so each site is only
+    # tested against the polygons whose bounding boxes it falls in,
+    # instead of unioning everything into one giant geometry first
+    polys = saltwater_polygons.geometry.values
+    tree = shapely.STRtree(polys)
+
+    # Prepare the polygons in place and test the bbox candidates with
+    # contains against them, so each polygon's edge index is reused for
+    # all of its candidate points. (A predicate on tree.query would
+    # prepare the point side and leave the polygons unprepared.)
+    shapely.prepare(polys)
+
     # Classify each site: True = saltwater, False = freshwater
-    gdf_sites["saltwater"] = gdf_sites.geometry.within(saltwater_union)
+    xs = gdf_sites.geometry.x.to_numpy()
+    ys = gdf_sites.geometry.y.to_numpy()
+    pts = shapely.points(xs, ys)
+    cand_pts, cand_polys = tree.query(pts)
+    inside = shapely.contains(polys[cand_polys], pts[cand_pts])
+    saltwater = np.zeros(len(pts), dtype=bool)
+    saltwater[cand_pts[inside]] = True
+    gdf_sites["saltwater"] = saltwater
     
     saltwater_count = gdf_sites["saltwater"].sum()
     freshwater_count = (~gdf_sites["saltwater"]).sum()
@@ -312,20 +579,21 @@ def classify_sites(gdf_sites, saltwater_polygons):
     return gdf_sites
 
 
-def save_results(gdf_sites, cache_dir, output_name="site_saltwater_flags.csv"):
+def save_results(gdf_sites, cache_dir, output_name="site_saltwater_flags.csv", debug=False):
     """
     Save classification results to CSV file.
-    
+
     Args:
         gdf_sites (gpd.GeoDataFrame): Classified sites
         output_name (str): Output file name
+        debug (bool): Also dump the full GeoDataFrame to a GeoPackage for review
     """
     # Ensure output directory exists
     output_path = os.path.join(cache_dir, output_name)
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
-    # For testing
-    gdf_sites.to_file(os.path.join(cache_dir, 'gdf_sites.shp'), driver='ESRI Shapefile')
+    if debug:
+        gdf_sites.to_file(os.path.join(cache_dir, 'gdf_sites.gpkg'), driver='GPKG', engine='pyogrio')
     
     # Save only station code and classification flag
     gdf_sites[["StationCode", "saltwater"]].to_csv(output_path, index=False)
@@ -340,30 +608,44 @@ def main():
     # Setup
     cache_dir = setup_cache_directory()
     
-    # Load saltwater polygon data sources
-    wetlands = load_wetlands(buffer_meters=10)
-    lakes = load_saline_lakes(cache_dir, buffer_meters=50)
-    marine_areas = load_marine_coastal_areas(buffer_meters=80)
-    estuaries = load_estuaries(buffer_meters=50)
-
-    # For testing: Save saltwater features to file for review
-    # wetlands.to_file(os.path.join(cache_dir, 'saline_wetlands.shp'), driver='ESRI Shapefile')
-    # lakes.to_file(os.path.join(cache_dir, 'saline_lakes.shp'), driver='ESRI Shapefile')
-    # marine_areas.to_file(os.path.join(cache_dir, 'saline_marine_areas.shp'), driver='ESRI Shapefile')
-    # estuaries.to_file(os.path.join(cache_dir, 'saline_estuaries.shp'), driver='ESRI Shapefile')
-
-    # Combine all saltwater polygons
-    print("Combining saltwater polygon sources...")
-    geoms = pd.concat([
-        wetlands.geometry,
-        lakes.geometry,
-        marine_areas.geometry,
-        estuaries.geometry
-    ], ignore_index=True)
-    saltwater_polygons = gpd.GeoDataFrame(
-        geometry = geoms,
-        crs="EPSG:3310"
-    )
+    # Reuse the cached saltwater polygons when the sources are unchanged
+    saltwater_polygons = load_saltwater_index(cache_dir)
+    if saltwater_polygons is None:
+        # Load saltwater polygon data sources concurrently; each loader is
+        # dominated by HTTPS round-trips to a different server
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            wetlands_future = pool.submit(load_wetlands)
+            lakes_future = pool.submit(load_saline_lakes, cache_dir, buffer_meters=50)
+            marine_future = pool.submit(load_marine_coastal_areas, buffer_meters=80)
+            estuaries_future = pool.submit(load_estuaries)
+            wetlands = wetlands_future.result()
+            lakes = lakes_future.result()
+            marine_areas = marine_future.result()
+            estuaries = estuaries_future.result()
+
+        # For testing: Save saltwater features to file for review
+        # wetlands.to_file(os.path.join(cache_dir, 'saline_wetlands.shp'), driver='ESRI Shapefile')
+        # lakes.to_file(os.path.join(cache_dir, 'saline_lakes.shp'), driver='ESRI Shapefile')
+        # marine_areas.to_file(os.path.join(cache_dir, 'saline_marine_areas.shp'), driver='ESRI Shapefile')
+        # estuaries.to_file(os.path.join(cache_dir, 'saline_estuaries.shp'), driver='ESRI Shapefile')
+
+        # Union each raw source once and buffer the union, rather than
+        # buffering every component polygon before unioning
+        wetland_union = union_and_buffer(wetlands.geometry.values, 10)
+        estuary_union = union_and_buffer(estuaries.geometry.values, 50)
+
+        # Combine all saltwater polygons; concatenating the raw geometry
+        # arrays just copies pointers, skipping the pandas index machinery
+        print("Combining saltwater polygon sources...")
+        geom_array = np.concatenate([
+            np.array([wetland_union, estuary_union], dtype=object),
+            np.asarray(lakes.geometry.values),
+            np.asarray(marine_areas.geometry.values)
+        ])
+        saltwater_polygons = gpd.GeoDataFrame(
+            geometry=gpd.GeoSeries(geom_array, crs="EPSG:3310")
+        )
+        save_saltwater_index(saltwater_polygons, cache_dir)
     print(f"Total saltwater polygons: {len(saltwater_polygons)}")
 
     # Load and classify monitoring sites